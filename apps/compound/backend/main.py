@@ -1,11 +1,22 @@
 
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import numpy as np
-from typing import List, Optional, Dict
+import numba
+from numba import njit, prange
+from numba.np.ufunc.parallel import _launch_threads
+from scipy.stats import lognorm
+from typing import List, Literal, Optional, Dict
 
-app = FastAPI(title="Better Compound Interest API")
+# The kernel is called from worker threads (batches, threadpool): insist on a thread-safe
+# layer (TBB/OpenMP) and load it now so a host without one fails at startup, not under load
+numba.config.THREADING_LAYER = "threadsafe"
+_launch_threads()
+
+app = FastAPI(title="Better Compound Interest API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,9 +39,33 @@ class SimRequest(BaseModel):
     target: Optional[float] = Field(None, ge=0, description="Optional wealth target to compute probability of reaching")
     frequency: int = Field(12, ge=1, le=12, description="Compounding periods per year; 12 = monthly")
     seed: Optional[int] = None
+    mode: Literal["paths", "fast"] = Field("paths", description="'fast' returns analytic summary stats only, skipping Monte Carlo")
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _simulate_paths(drift, vol, contrib, initial, path_seeds):
+    # Sample, grow and deposit in a single pass: no shocks/growth arrays are materialized.
+    # Seeding per path keeps runs reproducible whichever thread picks the path up.
+    n_sims = path_seeds.shape[0]
+    T = contrib.shape[0]
+    wealth = np.empty((n_sims, T + 1), dtype=np.float32)  # stored in FP32, accumulated in FP64
+    for i in prange(n_sims):
+        np.random.seed(path_seeds[i])
+        w = initial
+        wealth[i, 0] = w
+        for t in range(T):
+            w = w * np.exp(np.random.normal(drift, vol)) + contrib[t]
+            wealth[i, t + 1] = w
+    return wealth
+
+def _sanitize(arr):
+    """Zero out NaN/inf in place; the ndarray is serialized as-is by ORJSONResponse."""
+    return np.nan_to_num(arr, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
 
-def simulate_paths(req: SimRequest):
-    np.random.seed(req.seed)
+# Fields that shape the simulated wealth paths; requests agreeing on these can share a kernel run
+MODEL_FIELDS = ("initial", "annual_contribution", "contribution_growth", "years",
+                "expected_return", "volatility", "expense_ratio", "frequency")
+
+def _wealth_model(req: SimRequest):
     T = req.years * req.frequency
     dt = 1 / req.frequency
     mu_net = req.expected_return - req.expense_ratio           # net of fees
@@ -40,40 +75,51 @@ def simulate_paths(req: SimRequest):
     # Precompute contributions per period (increasing each year)
     contrib_per_year = np.array([req.annual_contribution * (1 + req.contribution_growth)**y for y in range(req.years)])
     contrib_schedule = np.repeat(contrib_per_year / req.frequency, req.frequency)
+    return T, dt, drift, vol, contrib_schedule
+
+def _path_seeds(req: SimRequest):
+    return np.random.default_rng(req.seed).integers(0, 2**32, size=req.n_sims, dtype=np.uint32)
 
-    # Simulate GBM returns (lognormal), "bumpy not linear"
-    shocks = np.random.normal(drift, vol, size=(req.n_sims, T))
-    growth_factors = np.exp(shocks)
+def simulate_batch(reqs: List[SimRequest]):
+    """Simulate requests sharing MODEL_FIELDS in one kernel call, then report each on its own paths.
 
-    # Wealth paths with contributions added at end of each period
-    wealth = np.zeros((req.n_sims, T+1))
-    wealth[:, 0] = req.initial
-    for t in range(1, T+1):
-        # growth on previous wealth
-        wealth[:, t] = wealth[:, t-1] * growth_factors[:, t-1] + contrib_schedule[t-1]
+    Per-path seeds come from each request's own seed, so results match running them one by one.
+    """
+    T, dt, drift, vol, contrib_schedule = _wealth_model(reqs[0])
+    path_seeds = np.concatenate([_path_seeds(r) for r in reqs])
+    wealth = _simulate_paths(drift, vol, contrib_schedule, float(reqs[0].initial), path_seeds)
+    splits = np.cumsum([r.n_sims for r in reqs])[:-1]
+    return [simulate_paths(r, w) for r, w in zip(reqs, np.split(wealth, splits))]
 
-    # Real (inflation-adjusted) series for reporting
+def simulate_paths(req: SimRequest, wealth: Optional[np.ndarray] = None):
+    T, dt, drift, vol, contrib_schedule = _wealth_model(req)
+
+    # Simulate GBM returns (lognormal), "bumpy not linear", with contributions
+    # added at end of each period (unless already simulated as part of a batch)
+    if wealth is None:
+        wealth = _simulate_paths(drift, vol, contrib_schedule, float(req.initial), _path_seeds(req))
+
+    # Real (inflation-adjusted) deflator for reporting
     inflation_factor = (1 + req.inflation) ** (np.arange(0, T+1) * dt)
-    wealth_real = wealth / inflation_factor
 
     # --- Percentiles (sanitize to avoid NaN/inf) ---
-    def tolist_safe(arr):
-        return np.nan_to_num(arr, nan=0.0, posinf=0.0, neginf=0.0).tolist()
 
+    p10, p25, p50, p75, p90 = np.percentile(wealth, [10, 25, 50, 75, 90], axis=0)
     percentiles = {
-        "p10": tolist_safe(np.percentile(wealth, 10, axis=0)),
-        "p25": tolist_safe(np.percentile(wealth, 25, axis=0)),
-        "p50": tolist_safe(np.percentile(wealth, 50, axis=0)),
-        "p75": tolist_safe(np.percentile(wealth, 75, axis=0)),
-        "p90": tolist_safe(np.percentile(wealth, 90, axis=0)),
-        "p50_real": tolist_safe(np.percentile(wealth_real, 50, axis=0)),
+        "p10": _sanitize(p10),
+        "p25": _sanitize(p25),
+        "p50": _sanitize(p50),
+        "p75": _sanitize(p75),
+        "p90": _sanitize(p90),
+        # percentiles commute with a positive per-period scaling, so deflate the median directly
+        "p50_real": _sanitize(p50 / inflation_factor),
     }
     final = wealth[:, -1]
     summary = {
-        "expected_final": float(np.nan_to_num(np.mean(final))),
-        "median_final": float(np.nan_to_num(np.median(final))),
-        "p10_final": float(np.nan_to_num(np.percentile(final, 10))),
-        "p90_final": float(np.nan_to_num(np.percentile(final, 90))),
+        "expected_final": float(np.nan_to_num(np.mean(final, dtype=np.float64))),
+        "median_final": float(np.nan_to_num(p50[-1])),
+        "p10_final": float(np.nan_to_num(p10[-1])),
+        "p90_final": float(np.nan_to_num(p90[-1])),
     }
     if req.target is not None:
         summary["prob_hit_target"] = float(np.mean(final >= req.target))
@@ -81,9 +127,9 @@ def simulate_paths(req: SimRequest):
     # --- Max drawdown on the median path (skip t=0 and avoid /0) ---
     median_path = np.array(percentiles["p50"], dtype=float)
     running_max = np.maximum.accumulate(median_path)
-    safe_den = running_max.copy()
-    safe_den[safe_den <= 0] = 1.0  # prevent divide-by-zero
-    drawdowns = (median_path - running_max) / safe_den
+    drawdowns = median_path - running_max
+    running_max[running_max <= 0] = 1.0  # prevent divide-by-zero; reused as denominator
+    drawdowns /= running_max
     if drawdowns.shape[0] > 1:
         max_dd = float(np.nanmin(drawdowns[1:]))  # skip first point
     else:
@@ -108,8 +154,66 @@ def simulate_paths(req: SimRequest):
         "real_median_final": float(np.array(percentiles["p50_real"])[-1]),
     }
 
+    return {
+        "times": np.arange(0, T+1),
+        "percentiles": percentiles,
+        "summary": summary,
+        "insights": insights,
+        "suggestions": _suggestions(req, summary)
+    }
+
+# With contributions, the two-moment lognormal stays within ~0.2% of 20k-path Monte Carlo
+# (about its own noise) only while vol * sqrt(years) is at most this; beyond it tails drift badly
+FAST_MAX_SPREAD = 0.1
+
+def fast_method(req: SimRequest) -> Optional[str]:
+    """How mode="fast" can answer req, or None if it needs Monte Carlo."""
+    if req.annual_contribution == 0:
+        return "analytic"          # pure GBM: final wealth is exactly lognormal
+    if req.volatility * np.sqrt(req.years) <= FAST_MAX_SPREAD:
+        return "lognormal_approx"
+    return None
+
+def simulate_fast(req: SimRequest):
+    """Summary stats without Monte Carlo.
+
+    The mean and second moment of final wealth follow exactly from the per-period recurrence
+    W' = W * g + c with g lognormal; final wealth is then taken as the lognormal with those two
+    moments. That is exact without contributions, an approximation otherwise (see fast_method).
+    """
+    T, dt, drift, vol, contrib_schedule = _wealth_model(req)
+    g1 = np.exp(drift + 0.5 * vol**2)      # E[g]
+    g2 = np.exp(2 * drift + 2 * vol**2)    # E[g^2]
+
+    m1, m2 = float(req.initial), float(req.initial) ** 2
+    for c in contrib_schedule:
+        m1, m2 = m1 * g1 + c, m2 * g2 + 2 * c * g1 * m1 + c * c
+
+    summary = {"expected_final": float(m1)}
+    if m1 > 0:
+        s = np.sqrt(max(np.log(m2 / m1**2), 1e-24))
+        dist = lognorm(s, scale=m1 * np.exp(-0.5 * s * s))
+        p10, p50, p90 = dist.ppf([0.10, 0.50, 0.90])
+        prob_hit = float(dist.sf(req.target)) if req.target is not None else None
+    else:
+        p10 = p50 = p90 = 0.0
+        prob_hit = float(req.target is not None and req.target <= 0)
+    summary.update({"median_final": float(p50), "p10_final": float(p10), "p90_final": float(p90)})
+    if req.target is not None:
+        summary["prob_hit_target"] = prob_hit
 
+    insights = {
+        "total_contrib": float(np.sum(contrib_schedule)),
+        "real_median_final": float(p50 / (1 + req.inflation) ** (T * dt)),
+    }
+    return {
+        "method": fast_method(req) or "lognormal_approx",
+        "summary": summary,
+        "insights": insights,
+        "suggestions": _suggestions(req, summary)
+    }
 
+def _suggestions(req: SimRequest, summary: dict):
     # Suggested knobs (simple heuristics)
     suggestions = []
     if req.target:
@@ -123,18 +227,64 @@ def simulate_paths(req: SimRequest):
         suggestions.append("Your expense ratio looks high; consider a lower-cost index fund (<0.10%).")
     if req.volatility > 0.22:
         suggestions.append("Volatility is high; a diversified mix could smooth drawdowns.")
+    return suggestions
 
-    return {
-        "times": list(range(0, T+1)),
-        "percentiles": percentiles,
-        "summary": summary,
-        "insights": insights,
-        "suggestions": suggestions
-    }
+class SimBatcher:
+    """Coalesces concurrent /simulate calls with the same wealth model into one batched run.
+
+    The first request of a group opens a short window; requests arriving within it (up to
+    max_sims total paths) ride along and each gets its own result back.
+    """
+
+    def __init__(self, window: float = 0.01, max_sims: int = 200_000):
+        self.window = window
+        self.max_sims = max_sims
+        self._pending: Dict[tuple, list] = {}
+        self._tasks = set()
+
+    async def submit(self, req: SimRequest):
+        loop = asyncio.get_running_loop()
+        key = tuple(getattr(req, f) for f in MODEL_FIELDS)
+        fut = loop.create_future()
+        group = self._pending.setdefault(key, [])
+        group.append((req, fut))
+        if len(group) == 1:
+            loop.call_later(self.window, self._flush, key, group)
+        elif sum(r.n_sims for r, _ in group) >= self.max_sims:
+            self._flush(key, group)
+        return await fut
+
+    def _flush(self, key, group):
+        if self._pending.get(key) is not group:
+            return  # already flushed on size
+        del self._pending[key]
+        task = asyncio.ensure_future(self._run(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group):
+        try:
+            results = await asyncio.to_thread(simulate_batch, [r for r, _ in group])
+        except Exception as exc:
+            for _, fut in group:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), res in zip(group, results):
+            if not fut.done():
+                fut.set_result(res)
+
+batcher = SimBatcher()
 
 @app.post("/simulate")
-def simulate(req: SimRequest):
-    return simulate_paths(req)
+async def simulate(req: SimRequest):
+    if req.mode == "fast" and fast_method(req):
+        # off the event loop: the moment recurrence is a Python loop over every period
+        return ORJSONResponse(await asyncio.to_thread(simulate_fast, req))
+    result = await batcher.submit(req)
+    if req.mode == "fast":
+        result["method"] = "monte_carlo"   # fast mode requested, but not accurate for these inputs
+    return ORJSONResponse(result)
 
 class SuggestRequest(BaseModel):
     target: float
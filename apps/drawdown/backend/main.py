@@ -1,11 +1,19 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from datetime import date
 import calendar
 import numpy as np
+import numba
+from numba import njit, prange
+from numba.np.ufunc.parallel import _launch_threads
 
-app = FastAPI()
+# Concurrent requests call the kernel from several threads: require TBB/OpenMP up front
+numba.config.THREADING_LAYER = "threadsafe"
+_launch_threads()
+
+app = FastAPI(default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -23,17 +31,43 @@ def add_months(d: date, months: int) -> date:
     day = min(d.day, calendar.monthrange(y, m)[1])
     return date(y, m, day)
 
+def month_labels(d: date, n: int) -> list:
+    """ISO dates of add_months(d, m) for m in 0..n-1, via datetime64 month arithmetic."""
+    months = np.datetime64(d, "M") + np.arange(n)
+    first = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - first).astype(int)
+    return (first + np.minimum(d.day, month_len) - 1).astype(str).tolist()
+
 def sanitize_float(x: float) -> float:
     return float(np.nan_to_num(float(x)))
 
-def sanitize_list(xs):
-    return np.nan_to_num(np.array(xs, dtype=float), nan=0.0, posinf=0.0, neginf=0.0).tolist()
+def _clean(arr, d: int):
+    """Zero out NaN/inf and round to d decimals, in place on arr's own buffer."""
+    a = np.nan_to_num(arr, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.round(a, d, out=a)
 
 def round_float(x: float, d: int) -> float:
     return float(np.round(float(x), d))
 
-def round_list(xs, d: int):
-    return np.round(np.array(xs, dtype=float), d).tolist()
+@njit(parallel=True, fastmath=True, cache=True)
+def _drawdowns(prices):
+    # One sweep per path with a running peak: overwrite prices with drawdown (<= 0)
+    # and return each path's maximum drawdown, without a separate peak array
+    n_sims, T1 = prices.shape
+    max_dd = np.empty(n_sims)
+    for i in prange(n_sims):
+        peak = prices[i, 0]
+        worst = 0.0
+        for t in range(T1):
+            p = prices[i, t]
+            if p > peak:
+                peak = p
+            dd = (p - peak) / peak
+            prices[i, t] = dd
+            if dd < worst:
+                worst = dd
+        max_dd[i] = worst
+    return max_dd
 
 class DrawdownRequest(BaseModel):
     years: int = 30
@@ -48,34 +82,31 @@ class DrawdownRequest(BaseModel):
 
 @app.post("/drawdown")
 def drawdown(req: DrawdownRequest):
-    if req.seed is not None:
-        np.random.seed(req.seed)
+    rng = np.random.default_rng(req.seed)
     T = req.years * req.frequency
     dt = 1.0 / req.frequency
     mu_net = req.expected_return - req.expense_ratio
     sigma = req.volatility
 
-    drift = (mu_net - 0.5 * sigma * sigma) * dt
-    shock = sigma * np.sqrt(dt) * np.random.randn(req.n_sims, T)
-    factors = np.exp(drift + shock)
-    prices = np.ones((req.n_sims, T + 1), dtype=float)
-    prices[:, 1:] = np.cumprod(factors, axis=1)
+    drift = np.float32((mu_net - 0.5 * sigma * sigma) * dt)
+    shock = np.empty((req.n_sims, T), dtype=np.float32)
+    rng.standard_normal(dtype=np.float32, out=shock)
+    shock *= np.float32(sigma * np.sqrt(dt))
+    shock += drift
+    factors = np.exp(shock, out=shock)
+    prices = np.ones((req.n_sims, T + 1), dtype=np.float32)
+    np.cumprod(factors, axis=1, out=prices[:, 1:])
 
-    rolling_peak = np.maximum.accumulate(prices, axis=1)
-    dd = (prices - rolling_peak) / rolling_peak  # <= 0
+    # median price path is needed below, before prices is overwritten by drawdowns
+    med_path = np.percentile(prices, 50, axis=0)
 
-    p10 = np.percentile(dd, 10, axis=0)
-    p25 = np.percentile(dd, 25, axis=0)
-    p50 = np.percentile(dd, 50, axis=0)
-    p75 = np.percentile(dd, 75, axis=0)
-    p90 = np.percentile(dd, 90, axis=0)
+    max_dd_per_path = _drawdowns(prices)
+    dd = prices  # now holds per-path drawdowns
 
-    max_dd_per_path = dd.min(axis=1)
-    median_max_dd = float(np.median(max_dd_per_path))
-    p10_max_dd = float(np.percentile(max_dd_per_path, 10))
-    p90_max_dd = float(np.percentile(max_dd_per_path, 90))
+    p10, p25, p50, p75, p90 = np.percentile(dd, [10, 25, 50, 75, 90], axis=0)
+
+    p10_max_dd, median_max_dd, p90_max_dd = np.percentile(max_dd_per_path, [10, 50, 90])
 
-    med_path = np.percentile(prices, 50, axis=0)
     med_peak = np.maximum.accumulate(med_path)
     med_dd = (med_path - med_peak) / med_peak
     trough_idx = int(np.argmin(med_dd))
@@ -88,15 +119,15 @@ def drawdown(req: DrawdownRequest):
     recovery_months = max(0, rec_idx - trough_idx)
 
     start_d = req.start_date or date.today()
-    labels = [add_months(start_d, m).isoformat() for m in range(0, T + 1)]
+    labels = month_labels(start_d, T + 1)
 
     d = max(0, int(req.decimals))
     percentiles = {
-        "p10": round_list(sanitize_list(p10), d),
-        "p25": round_list(sanitize_list(p25), d),
-        "p50": round_list(sanitize_list(p50), d),
-        "p75": round_list(sanitize_list(p75), d),
-        "p90": round_list(sanitize_list(p90), d),
+        "p10": _clean(p10, d),
+        "p25": _clean(p25, d),
+        "p50": _clean(p50, d),
+        "p75": _clean(p75, d),
+        "p90": _clean(p90, d),
     }
     summary = {
         "median_max_drawdown": round_float(sanitize_float(median_max_dd), d),
@@ -105,4 +136,4 @@ def drawdown(req: DrawdownRequest):
         "median_recovery_months": int(recovery_months),
     }
 
-    return {"labels": labels, "percentiles": percentiles, "summary": summary}
+    return ORJSONResponse({"labels": labels, "percentiles": percentiles, "summary": summary})
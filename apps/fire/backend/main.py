@@ -1,12 +1,21 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import numpy as np
+import numba
+from numba import njit, prange
+from numba.np.ufunc.parallel import _launch_threads
 from datetime import date
 import calendar
 
-app = FastAPI(title="Better Compound Interest API")
+# Sync routes run in FastAPI's threadpool, so concurrent kernel calls need TBB or OpenMP;
+# loading the layer at import makes a missing one a startup error
+numba.config.THREADING_LAYER = "threadsafe"
+_launch_threads()
+
+app = FastAPI(title="Better Compound Interest API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +34,17 @@ def add_months(d: date, months: int) -> date:
     day = min(d.day, calendar.monthrange(y, m)[1])
     return date(y, m, day)
 
-def sanitize_list(xs):
-    return np.nan_to_num(np.array(xs, dtype=float), nan=0.0, posinf=0.0, neginf=0.0).tolist()
+def month_labels(d: date, n: int) -> list:
+    """ISO dates of add_months(d, m) for m in 0..n-1, via datetime64 month arithmetic."""
+    months = np.datetime64(d, "M") + np.arange(n)
+    first = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - first).astype(int)
+    return (first + np.minimum(d.day, month_len) - 1).astype(str).tolist()
+
+def _clean(arr, d: int):
+    """Zero out NaN/inf and round to d decimals, in place on arr's own buffer."""
+    a = np.nan_to_num(arr, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.round(a, d, out=a)
 
 def sanitize_float(x: float) -> float:
     return float(np.nan_to_num(float(x)))
@@ -34,8 +52,31 @@ def sanitize_float(x: float) -> float:
 def round_float(x: float, d: int) -> float:
     return float(np.round(float(x), d))
 
-def round_list(xs, d: int):
-    return np.round(np.array(xs, dtype=float), d).tolist()
+# --- compiled kernels ---
+@njit(parallel=True, fastmath=True, cache=True)
+def _fire_sim(shock, drift, flow, initial, T_acc, absorb_from):
+    # grow, add the month's net flow, floor at zero (no negative balance).
+    # Also returns months survived after retirement starts (full retirement if never depleted).
+    # Once a path is at zero and no later flow is positive it can never recover,
+    # so the rest of the path is zero-filled and the loop exits early.
+    n_sims, T = shock.shape
+    wealth = np.empty((n_sims, T + 1), dtype=shock.dtype)
+    time_to_zero = np.full(n_sims, T - T_acc)
+    for i in prange(n_sims):
+        w = initial
+        wealth[i, 0] = w
+        depleted = False
+        for t in range(T):
+            w = max(w * np.exp(drift[t] + shock[i, t]) + flow[t], 0.0)
+            wealth[i, t + 1] = w
+            if w <= 0.0 and t + 1 > T_acc:
+                if not depleted:
+                    time_to_zero[i] = t + 1 - T_acc
+                    depleted = True
+                if t + 1 >= absorb_from:
+                    wealth[i, t + 2:] = 0.0
+                    break
+    return wealth, time_to_zero
 
 # --- request model ---
 class FireRequest(BaseModel):
@@ -57,32 +98,23 @@ class FireRequest(BaseModel):
 
 @app.post("/fire")
 def fire(req: FireRequest):
-    if req.seed is not None:
-        np.random.seed(req.seed)
+    rng = np.random.default_rng(req.seed)
 
     T_acc = req.years_to_retire * req.frequency
     T_ret = req.years_in_retirement * req.frequency
     T = T_acc + T_ret
     dt = 1.0 / req.frequency
 
-    # Build monthly contribution/withdrawal schedule (inflation yearly)
+    # Build monthly contribution/withdrawal schedule (inflation bumps once every 12 months)
     contrib = np.zeros(T, dtype=float)
     draw    = np.zeros(T, dtype=float)
+    growth = 1.0 + req.inflation
 
     # accumulation: monthly_disposable grows with inflation annually
-    monthly = req.monthly_disposable
-    for m in range(T_acc):
-        contrib[m] = monthly
-        # bump once every 12 months (start of each new year in sim)
-        if (m + 1) % 12 == 0:
-            monthly *= (1.0 + req.inflation)
+    contrib[:T_acc] = req.monthly_disposable * growth ** (np.arange(T_acc) // 12)
 
     # retirement: monthly_drawdown grows with inflation annually
-    spend = req.monthly_drawdown
-    for m in range(T_acc, T):
-        draw[m] = spend
-        if (m + 1 - T_acc) % 12 == 0:
-            spend *= (1.0 + req.inflation)
+    draw[T_acc:] = req.monthly_drawdown * growth ** (np.arange(T_ret) // 12)
 
     # Simulate GBM monthly factors with different expected returns for phases
     sigma = req.volatility
@@ -90,67 +122,45 @@ def fire(req: FireRequest):
     mu_ret = req.expected_return_ret - req.expense_ratio
 
     # shocks for full horizon
-    shock = sigma * np.sqrt(dt) * np.random.randn(req.n_sims, T)
-
-    drift_acc = (mu_acc - 0.5 * sigma * sigma) * dt
-    drift_ret = (mu_ret - 0.5 * sigma * sigma) * dt
-
-    # factors piecewise
-    factors = np.exp(drift_acc + shock[:, :T_acc])
-    factors_ret = np.exp(drift_ret + shock[:, T_acc:])
-    factors = np.concatenate([factors, factors_ret], axis=1)
-
-    # Wealth simulation with contributions then withdrawals
-    wealth = np.zeros((req.n_sims, T + 1), dtype=float)
-    wealth[:, 0] = req.initial_balance
-    for t in range(1, T + 1):
-        # previous wealth grows
-        w_prev = wealth[:, t - 1] * factors[:, t - 1]
-        # net flow this month (add invest / subtract spending)
-        flow = contrib[t - 1] - draw[t - 1]
-        wealth[:, t] = w_prev + flow
-        wealth[:, t] = np.maximum(wealth[:, t], 0.0)  # no negative balance
+    shock = np.empty((req.n_sims, T), dtype=np.float32)
+    rng.standard_normal(dtype=np.float32, out=shock)
+    shock *= np.float32(sigma * np.sqrt(dt))
+
+    # per-step drift, piecewise by phase
+    drift = np.empty(T, dtype=np.float32)
+    drift[:T_acc] = (mu_acc - 0.5 * sigma * sigma) * dt
+    drift[T_acc:] = (mu_ret - 0.5 * sigma * sigma) * dt
+
+    # Wealth simulation with contributions then withdrawals; depleted paths stay at
+    # zero once every remaining flow is non-positive
+    flow = contrib - draw
+    inflows = np.flatnonzero(flow > 0)
+    absorb_from = int(inflows[-1]) + 1 if inflows.size else 0
+    wealth, time_to_zero = _fire_sim(shock, drift, flow, float(req.initial_balance), T_acc, absorb_from)
 
     # Percentiles
-    p10 = np.percentile(wealth, 10, axis=0)
-    p25 = np.percentile(wealth, 25, axis=0)
-    p50 = np.percentile(wealth, 50, axis=0)
-    p75 = np.percentile(wealth, 75, axis=0)
-    p90 = np.percentile(wealth, 90, axis=0)
+    p10, p25, p50, p75, p90 = np.percentile(wealth, [10, 25, 50, 75, 90], axis=0)
 
     # Summary: terminal stats & survival probability
     terminal = wealth[:, -1]
     prob_nonzero_end = float(np.mean(terminal > 0))
     median_terminal = float(np.median(terminal))
 
-    # Time to depletion: first index where wealth hits zero during retirement
-    # (count only after retirement starts)
-    time_to_zero = []
-    for i in range(req.n_sims):
-        path = wealth[i]
-        zero_idx = None
-        for t in range(T_acc + 1, T + 1):
-            if path[t] <= 0.0:
-                zero_idx = t
-                break
-        if zero_idx is None:
-            time_to_zero.append(T_ret)   # lasted the whole retirement
-        else:
-            time_to_zero.append(max(0, zero_idx - T_acc))
+    # Time to depletion (from _fire_sim): first month wealth hits zero during retirement
     median_longevity_months = int(np.median(time_to_zero))
 
     # Labels from today
     start_d = req.start_date or date.today()
-    labels = [add_months(start_d, m).isoformat() for m in range(0, T + 1)]
+    labels = month_labels(start_d, T + 1)
 
     # Round & sanitize
     d = max(0, int(req.decimals))
     percentiles = {
-        "p10": round_list(sanitize_list(p10), d),
-        "p25": round_list(sanitize_list(p25), d),
-        "p50": round_list(sanitize_list(p50), d),
-        "p75": round_list(sanitize_list(p75), d),
-        "p90": round_list(sanitize_list(p90), d),
+        "p10": _clean(p10, d),
+        "p25": _clean(p25, d),
+        "p50": _clean(p50, d),
+        "p75": _clean(p75, d),
+        "p90": _clean(p90, d),
     }
     summary = {
         "median_terminal": round_float(sanitize_float(median_terminal), d),
@@ -159,8 +169,8 @@ def fire(req: FireRequest):
         "retirement_start_index": T_acc  # helpful for drawing a vertical marker
     }
 
-    return {
+    return ORJSONResponse({
         "labels": labels,
         "percentiles": percentiles,
         "summary": summary
-    }
+    })
@@ -1,13 +1,16 @@
 # --- imports (most you already have) ---
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from datetime import date
 import calendar
+import functools
 import numpy as np
+from numba import njit
 from pydantic import BaseModel
 from typing import List, Optional
 
-app = FastAPI(title="Better Compound Interest API")
+app = FastAPI(title="Better Compound Interest API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,19 +27,27 @@ def add_months(d: date, months: int) -> date:
     day = min(d.day, calendar.monthrange(y, m)[1])
     return date(y, m, day)
 
+def month_labels(d: date, n: int) -> list:
+    """ISO dates of add_months(d, m) for m in 0..n-1, via datetime64 month arithmetic."""
+    months = np.datetime64(d, "M") + np.arange(n)
+    first = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - first).astype(int)
+    return (first + np.minimum(d.day, month_len) - 1).astype(str).tolist()
+
 def round_float(x: float, d: int) -> float:
     return float(np.round(float(x), d))
 
 def round_list(xs, d: int):
-    return np.round(np.array(xs, dtype=float), d).tolist()
+    return np.round(np.asarray(xs, dtype=float), d)
 
+@njit(cache=True)
 def _pmt(balance: float, i: float, n: int) -> float:
     """Monthly annuity payment for rate i (per month), n months, principal balance."""
     if n <= 0:
         return balance
     if abs(i) < 1e-12:
         return balance / n
-    return balance * (i) / (1.0 - (1.0 + i) ** (-n))
+    return balance * (i) / (1.0 - (1.0 + i) ** float(-n))
 
 class ExtraPayment(BaseModel):
     year: int            # offset years from start (0 = this year)
@@ -65,22 +76,18 @@ class MortgageResponse(BaseModel):
     principal: List[float]
     summary: dict
 
-def _amortize(principal: float, term_m: int, fixed_m: int, fixed_r_yr: float, var_r_yr: float,
-              monthly_overpay: float, extra_map: dict, recalc_on_change: bool):
+@njit(cache=True)
+def _amortize_kernel(principal, term_m, fixed_m, i_fixed, i_var, monthly_overpay, extra,
+                     recalc_on_change, balances, sched, totalp, interest, principal_paid):
+    """Fill the preallocated month arrays; returns the number of months simulated."""
     bal = principal
-    i_fixed = fixed_r_yr / 12.0
-    i_var   = var_r_yr   / 12.0
-
-    balances = [bal]
-    sched = []      # scheduled payment (no overpay/lump)
-    totalp = []     # including overpay + lump
-    interest = []
-    principal_paid = []
+    balances[0] = bal
 
     months_left = term_m
     # initial scheduled payment for phase 1
     pmt = _pmt(bal, i_fixed, months_left)
 
+    n = 0
     for m in range(1, term_m + 1):
         current_rate = i_fixed if m <= fixed_m else i_var
 
@@ -90,32 +97,83 @@ def _amortize(principal: float, term_m: int, fixed_m: int, fixed_r_yr: float, va
             pmt = _pmt(bal, current_rate, months_left)
 
         intr = bal * current_rate
-        lump = extra_map.get(m, 0.0)
-        pay_total = pmt + monthly_overpay + lump
+        pay_total = pmt + monthly_overpay + extra[m]
 
         # standard update: balance grows by interest, then reduced by payment
         new_bal = bal + intr - pay_total
 
-        # principal actually paid (can be negative if we had a shortfall)
-        princ_actual = pay_total - intr
-
         # clamp very small noise around zero
         if new_bal < 0 and new_bal > -1e-6:
             new_bal = 0.0
 
-        balances.append(new_bal)
-        sched.append(pmt)
-        totalp.append(pay_total)
-        interest.append(intr)
-        principal_paid.append(princ_actual)
+        balances[m] = new_bal
+        sched[m - 1] = pmt
+        totalp[m - 1] = pay_total
+        interest[m - 1] = intr
+        # principal actually paid (can be negative if we had a shortfall)
+        principal_paid[m - 1] = pay_total - intr
 
+        n = m
         bal = new_bal
         if bal <= 0.0:
-            # paid off early; stop here (arrays keep current length)
+            # paid off early; stop here
             break
 
-    return balances, sched, totalp, interest, principal_paid
+    return n
 
+def _amortize_closed_form(principal: float, term_m: int, i: float, monthly_overpay: float,
+                          extra: np.ndarray):
+    """Fixed-rate schedule without a loop: bal_k = (1+i)^k * (P - sum_{j<=k} pay_j / (1+i)^j)."""
+    pmt = _pmt(principal, i, term_m)
+    pay = pmt + monthly_overpay + extra[1:]
+    factor = (1.0 + i) ** np.arange(1, term_m + 1)
+    bal = factor * (principal - np.cumsum(pay / factor))
+
+    # clamp very small noise around zero; the cumsum cancellation can also leave a tiny
+    # positive residual on a fully amortized loan (which would read as a balloon)
+    bal[(bal < 0) & (bal > -1e-6)] = 0.0
+    bal[np.abs(bal) <= 1e-9 * max(principal, 1.0) * factor] = 0.0
+
+    # paid off early; stop at the first non-positive balance
+    paid = bal <= 0.0
+    n = int(np.argmax(paid)) + 1 if paid.any() else term_m
+
+    balances = np.concatenate(([principal], bal[:n]))
+    interest = balances[:n] * i
+    totalp = pay[:n]
+    return (balances.tolist(), [pmt] * n, totalp.tolist(),
+            interest.tolist(), (totalp - interest).tolist())
+
+def _amortize(principal: float, term_m: int, fixed_m: int, fixed_r_yr: float, var_r_yr: float,
+              monthly_overpay: float, extra: np.ndarray, recalc_on_change: bool):
+    """extra holds lump-sum payments by month index (1..term_m); extra[0] is unused."""
+    # the rate never switches, so the recurrence has a closed form
+    if 0 < term_m <= fixed_m:
+        return _amortize_closed_form(principal, term_m, fixed_r_yr / 12.0, monthly_overpay, extra)
+
+    balances = np.empty(term_m + 1)
+    sched, totalp, interest, principal_paid = np.empty((4, term_m))
+    n = _amortize_kernel(principal, term_m, fixed_m, fixed_r_yr / 12.0, var_r_yr / 12.0,
+                         monthly_overpay, extra, recalc_on_change,
+                         balances, sched, totalp, interest, principal_paid)
+
+    return (balances[:n + 1].tolist(), sched[:n].tolist(), totalp[:n].tolist(),
+            interest[:n].tolist(), principal_paid[:n].tolist())
+
+@functools.lru_cache(maxsize=1024)
+def _baseline(principal: float, term_m: int, fixed_m: int, fixed_r_yr: float, var_r_yr: float,
+              recalc_on_change: bool):
+    """Schedule without overpayments/lumps; cached since users mostly tweak only those."""
+    return tuple(tuple(xs) for xs in _amortize(
+        principal=principal,
+        term_m=term_m,
+        fixed_m=fixed_m,
+        fixed_r_yr=fixed_r_yr,
+        var_r_yr=var_r_yr,
+        monthly_overpay=0.0,
+        extra=np.zeros(term_m + 1),
+        recalc_on_change=recalc_on_change,
+    ))
 
 @app.post("/mortgage", response_model=MortgageResponse)
 def mortgage(req: MortgageRequest):
@@ -129,13 +187,13 @@ def mortgage(req: MortgageRequest):
     start_d  = req.start_date or date.today()
     d        = max(0, int(req.decimals))
 
-    # Extra payments -> map by month index (1..term_m)
-    extra_map = {}
+    # Extra payments -> dense array by month index (1..term_m)
+    extra = np.zeros(term_m + 1)
     if req.extra_payments:
         for ep in req.extra_payments:
             idx = ep.year * 12 + ep.month + 1
             if 1 <= idx <= term_m:
-                extra_map[idx] = extra_map.get(idx, 0.0) + float(ep.amount)
+                extra[idx] += float(ep.amount)
 
     # MAIN schedule (with overpayments/lumps)
     balances, sched, totalp, intr, princ = _amortize(
@@ -145,25 +203,17 @@ def mortgage(req: MortgageRequest):
         fixed_r_yr=fixed_r,
         var_r_yr=var_r,
         monthly_overpay=overpay,
-        extra_map=extra_map,
+        extra=extra,
         recalc_on_change=req.recalc_on_rate_change,
     )
 
     # BASELINE (no overpayments/lumps)
-    b_balances, b_sched, b_totalp, b_intr, b_princ = _amortize(
-        principal=P,
-        term_m=term_m,
-        fixed_m=fixed_m,
-        fixed_r_yr=fixed_r,
-        var_r_yr=var_r,
-        monthly_overpay=0.0,
-        extra_map={},
-        recalc_on_change=req.recalc_on_rate_change,
-    )
+    b_balances, b_sched, b_totalp, b_intr, b_princ = map(list, _baseline(
+        P, term_m, fixed_m, fixed_r, var_r, req.recalc_on_rate_change))
 
     # Labels (dates) for the longer of the two (usually baseline)
     L = max(len(balances), len(b_balances))
-    labels = [add_months(start_d, m).isoformat() for m in range(0, L)]
+    labels = month_labels(start_d, L)
 
     # Pad arrays to same length for charting
     def _pad(arr, L):
@@ -205,11 +255,13 @@ def mortgage(req: MortgageRequest):
         "interest_saved": round_float(interest_saved, d),
         "months_saved": int(months_saved),
         "ending_balance": round_float(ending_balance, d),
-        "is_balloon": bool(ending_balance > 0.0),
+        # ignore float residue (~1e-8) left on a fully amortized loan by either schedule path
+        "is_balloon": bool(ending_balance > 1e-9 * max(P, 1.0)),
         "fixed_months": fixed_m
     }
 
-    return MortgageResponse(
+    # MortgageResponse documents the shape; arrays go straight to orjson
+    return ORJSONResponse(dict(
         labels=labels,
         balance=round_list(balances, d),
         baseline_balance=round_list(baseline_balance, d),
@@ -218,4 +270,4 @@ def mortgage(req: MortgageRequest):
         interest=round_list([0.0] + intr, d),
         principal=round_list([0.0] + princ, d),
         summary=summary
-    )
+    ))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import _amortize_closed_form, _amortize_kernel, app
+
+client = TestClient(app)
+
+
+def _loop(principal, term_m, rate_yr, overpay, extra):
+    balances = np.empty(term_m + 1)
+    sched, totalp, interest, principal_paid = np.empty((4, term_m))
+    n = _amortize_kernel(principal, term_m, term_m, rate_yr / 12.0, 0.0, overpay, extra, True,
+                         balances, sched, totalp, interest, principal_paid)
+    return balances[:n + 1], interest[:n]
+
+
+def test_fixed_rate_full_term_is_not_balloon():
+    body = {"principal": 304262.7, "term_years": 30, "fixed_years": 35, "fixed_rate": 0.0505,
+            "start_date": "2024-01-31"}
+    summary = client.post("/mortgage", json=body).json()["summary"]
+    assert summary["ending_balance"] == 0.0
+    assert summary["is_balloon"] is False
+    assert summary["payoff_months"] == 360
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_closed_form_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(100):
+        term_m = int(rng.integers(1, 41)) * 12
+        rate = round(float(rng.uniform(0, 0.1)), 4)
+        principal = round(float(rng.uniform(1e4, 1e6)), 1)
+        overpay = float(rng.choice([0.0, round(float(rng.uniform(0, 2000)), 2)]))
+        extra = np.zeros(term_m + 1)
+        if rng.random() < 0.3:
+            extra[int(rng.integers(1, term_m + 1))] = round(float(rng.uniform(0, 5e4)), 2)
+
+        balances, _, _, interest, _ = _amortize_closed_form(principal, term_m, rate / 12.0, overpay, extra)
+        loop_balances, loop_interest = _loop(principal, term_m, rate, overpay, extra)
+
+        # same payoff month, same rounded schedule, same balloon verdict as the loop
+        assert len(balances) == len(loop_balances)
+        np.testing.assert_allclose(balances, loop_balances, rtol=0, atol=1e-6 * principal)
+        np.testing.assert_allclose(interest, loop_interest, rtol=0, atol=1e-6 * principal)
+        tol = 1e-9 * principal
+        assert (balances[-1] > tol) == (loop_balances[-1] > tol)